@@ -2,10 +2,14 @@
 Centralized prompt template manager for multi-language support and A/B testing.
 """
 
+import hashlib
 import json
 import os
+import string
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
+
+_FORMATTER = string.Formatter()
 
 
 class PromptManager:
@@ -26,6 +30,9 @@ class PromptManager:
         """
         self.default_lang = default_lang
         self._prompts_cache: Dict[str, Dict[str, Any]] = {}
+        # (lang, key) -> resolved template, so dotted keys are walked only once
+        self._resolved_cache: Dict[Tuple[str, str], Any] = {}
+        self._fingerprint_cache: Dict[Tuple[str, str], str] = {}
         self._load_prompts()
 
     def _load_prompts(self):
@@ -34,9 +41,32 @@ class PromptManager:
         from . import en_US
 
         self._prompts_cache["en_US"] = en_US.PROMPTS_EN_US
+        # Surface malformed braces at load time instead of on the first request
+        self._validate_templates(en_US.PROMPTS_EN_US)
 
         # English-only prompts.
 
+    @classmethod
+    def _validate_templates(cls, prompts: Any, path: str = "") -> None:
+        """
+        Check that every string template parses as a ``str.format`` template.
+
+        Raises:
+            ValueError: If a template contains an unbalanced ``{`` or ``}``
+        """
+        if isinstance(prompts, dict):
+            for k, v in prompts.items():
+                cls._validate_templates(v, f"{path}.{k}" if path else str(k))
+        elif isinstance(prompts, list):
+            for i, v in enumerate(prompts):
+                cls._validate_templates(v, f"{path}[{i}]")
+        elif isinstance(prompts, str):
+            try:
+                for _ in _FORMATTER.parse(prompts):
+                    pass
+            except ValueError as e:
+                raise ValueError(f"Invalid prompt template '{path}': {e}") from e
+
     def get(self, key: str, lang: Optional[str] = None, **kwargs) -> str:
         """
         Get a prompt template by key.
@@ -57,21 +87,65 @@ class PromptManager:
         if lang not in self._prompts_cache:
             raise ValueError(f"Language '{lang}' not supported")
 
+        prompt = self._resolve(key, lang)
+
+        # Handle string templates with variable substitution
+        if isinstance(prompt, str):
+            return prompt.format(**kwargs) if kwargs else prompt
+
+        return str(prompt)
+
+    def _resolve(self, key: str, lang: str) -> Any:
+        """Resolve a dotted prompt key, caching the result per language."""
+        cache_key = (lang, key)
+        cached = self._resolved_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         # Navigate nested keys (e.g., 'evaluation.quality')
-        keys = key.split(".")
         prompt_dict = self._prompts_cache[lang]
-
-        for k in keys:
+        for k in key.split("."):
             if isinstance(prompt_dict, dict) and k in prompt_dict:
                 prompt_dict = prompt_dict[k]
             else:
                 raise KeyError(f"Prompt key '{key}' not found for language '{lang}'")
 
-        # Handle string templates with variable substitution
         if isinstance(prompt_dict, str):
-            return prompt_dict.format(**kwargs) if kwargs else prompt_dict
+            self._resolved_cache[cache_key] = prompt_dict
+        return prompt_dict
+
+    def fingerprint(self, key: str, lang: Optional[str] = None) -> str:
+        """
+        Get a stable short identifier for a prompt template version.
+
+        The identifier is the first 16 hex chars of the SHA-256 of the template,
+        so it changes whenever the prompt text changes and can be used as a
+        cache-key prefix or for hit/miss metrics.
+
+        Args:
+            key: Prompt template key
+            lang: Language code
 
-        return str(prompt_dict)
+        Returns:
+            16-character hex digest
+        """
+        lang = lang or self.default_lang
+        cache_key = (lang, key)
+        digest = self._fingerprint_cache.get(cache_key)
+        if digest is not None:
+            return digest
+
+        if lang not in self._prompts_cache:
+            raise ValueError(f"Language '{lang}' not supported")
+
+        prompt = self._resolve(key, lang)
+        if isinstance(prompt, str):
+            payload = prompt
+        else:
+            payload = json.dumps(prompt, sort_keys=True, ensure_ascii=False)
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+        self._fingerprint_cache[cache_key] = digest
+        return digest
 
     def get_category(self, category: str, lang: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -140,12 +214,17 @@ class PromptManager:
             key: Prompt key
             value: Prompt template
             lang: Language code
+
+        Raises:
+            ValueError: If the template has unbalanced braces
         """
         lang = lang or self.default_lang
 
         if lang not in self._prompts_cache:
             self._prompts_cache[lang] = {}
 
+        self._validate_templates(value, key)
+
         # Handle nested keys
         keys = key.split(".")
         current = self._prompts_cache[lang]
@@ -156,3 +235,9 @@ class PromptManager:
             current = current[k]
 
         current[keys[-1]] = value
+        self._resolved_cache = {
+            cached: prompt for cached, prompt in self._resolved_cache.items() if cached[0] != lang
+        }
+        self._fingerprint_cache = {
+            cached: digest for cached, digest in self._fingerprint_cache.items() if cached[0] != lang
+        }
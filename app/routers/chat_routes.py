@@ -4563,7 +4563,9 @@ class StructuredChatAgent:
                 "parameters": self._drop_callables(params),
             }
             try:
-                storage_info = store_tool_output(
+                # Serializing and hashing large results is blocking work; keep it off the loop
+                storage_info = await asyncio.to_thread(
+                    store_tool_output,
                     session_id=self.session_id,
                     job_id=get_current_job(),
                     action=action_payload,
@@ -4,6 +4,8 @@ File Upload Routes
 处理文件上传，存储到按会话分组的目录中
 """
 
+import asyncio
+import hashlib
 import logging
 import os
 import shutil
@@ -129,6 +131,7 @@ class UploadResponse(BaseModel):
     extracted_path: Optional[str] = None
     extracted_files: Optional[int] = None
     session_id: Optional[str] = None
+    sha256: Optional[str] = None
 
 
 SORTED_ALLOWED_EXTENSIONS = sorted(
@@ -253,6 +256,43 @@ def _extract_archive(file_path: Path, dest_dir: Path) -> int:
     raise HTTPException(status_code=400, detail="不支持的压缩包格式")
 
 
+def _drop_page_cache(fd: int, sync: bool = False) -> None:
+    """提示内核释放文件的页缓存，避免大文件上传挤占热数据（仅 Linux 等支持的平台）
+
+    DONTNEED 会跳过脏页，刚写完的文件需 ``sync=True`` 先回写；该调用会阻塞，
+    在异步处理函数中应通过 ``asyncio.to_thread`` 执行。
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        if sync:
+            os.fdatasync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError as e:
+        logger.debug(f"posix_fadvise 失败: {e}")
+
+
+def _drop_path_page_cache(path: Path, sync: bool = False) -> None:
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        _drop_page_cache(fd, sync=sync)
+    finally:
+        os.close(fd)
+
+
+def _drop_tree_page_cache(root: Path) -> None:
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            _drop_path_page_cache(Path(dirpath) / name, sync=True)
+
+
 def _get_max_size(category: str) -> Optional[int]:
     return MAX_FILE_SIZE.get(category, DEFAULT_MAX_FILE_SIZE)
 
@@ -277,14 +317,16 @@ async def _save_upload_file(
     session_dir = _get_session_upload_dir(session_id)
     file_path = session_dir / f"{file_id}_{safe_name}"
     
-    # 保存文件并检查大小
+    # 保存文件并检查大小，同时计算 SHA-256 完整性校验
     file_size = 0
     max_size = _get_max_size(category)
+    hasher = hashlib.sha256()
     
     try:
         with open(file_path, "wb") as f:
             while chunk := await file.read(8192):  # 8KB chunks
                 file_size += len(chunk)
+                hasher.update(chunk)
                 if max_size is not None and file_size > max_size:
                     # 删除已写入的文件
                     f.close()
@@ -294,12 +336,23 @@ async def _save_upload_file(
                         detail=f"文件过大，最大允许 {max_size / 1024 / 1024:.1f}MB",
                     )
                 f.write(chunk)
+        # 回写并释放页缓存会阻塞，放到线程中执行
+        await asyncio.to_thread(_drop_path_page_cache, file_path, True)
+        # 源文件仅在 SpooledTemporaryFile 已溢出到磁盘时才有页缓存可释放；
+        # 对内存中的文件调用 fileno() 会强制 rollover，因此先检查 _rolled
+        if getattr(file.file, "_rolled", False):
+            try:
+                _drop_page_cache(file.file.fileno())
+            except (AttributeError, OSError, ValueError):
+                pass
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"保存文件失败: {e}")
         file_path.unlink(missing_ok=True)
         raise HTTPException(status_code=500, detail=f"保存文件失败: {str(e)}")
+
+    sha256 = hasher.hexdigest()
     
     extracted_path = None
     extracted_files = None
@@ -310,6 +363,8 @@ async def _save_upload_file(
         try:
             extracted_files = _extract_archive(file_path, extract_dir)
             extracted_path = str(extract_dir)
+            # 遍历解压目录可能较慢，放到线程中避免阻塞事件循环
+            await asyncio.to_thread(_drop_tree_page_cache, extract_dir)
         except HTTPException:
             shutil.rmtree(extract_dir, ignore_errors=True)
             raise
@@ -342,6 +397,7 @@ async def _save_upload_file(
         "extracted_files": extracted_files,
         "uploaded_at": datetime.now().isoformat(),
         "session_id": session_id,
+        "sha256": sha256,
     }
 
 
@@ -387,6 +443,7 @@ async def upload_file(
             extracted_path=file_info.get("extracted_path"),
             extracted_files=file_info.get("extracted_files"),
             session_id=session_id,
+            sha256=file_info.get("sha256"),
         )
     except HTTPException:
         raise
@@ -437,6 +494,7 @@ async def upload_image(
             extracted_path=file_info.get("extracted_path"),
             extracted_files=file_info.get("extracted_files"),
             session_id=session_id,
+            sha256=file_info.get("sha256"),
         )
     except HTTPException:
         raise
@@ -1,16 +1,144 @@
 import logging
 import json
 import asyncio
+import re
+import sys
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Callable, Union, AsyncIterator
 
-from dataclasses import dataclass
+from contextlib import aclosing
+from dataclasses import dataclass, field
 
 from app.llm import get_default_client
 
+try:  # optional faster JSON decoder for action payloads
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    _orjson = None
+
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Single-pass tag matcher for structured LLM responses.
+_PARSE_RE = re.compile(
+    r"<thinking>(?P<th>.*?)</thinking>"
+    r"|<action>(?P<act>.*?)</action>"
+    r"|<ready_to_answer(?P<attrs>[^>]*)>(?P<final>.*?)</ready_to_answer>",
+    re.DOTALL,
+)
+_READY_CLOSE_TAG = "</ready_to_answer>"
+_RESPONSE_TAGS = ("<thinking>", "<action>", "<ready_to_answer")
+_THINKING_RE = re.compile(r"<thinking>(.*?)</thinking>", re.DOTALL)
+_CONFIDENCE_RE = re.compile(r"confidence\s*=\s*[\"']?([0-9.]+)")
+_JSON_DECODER = json.JSONDecoder()
+
+_PRIOR_FINDINGS_MARKER = "\n\nPrior findings:\n"
+_NO_FINDINGS = "- (no notable findings)"
+_BRIEF_ITEM_CHARS = 300
+_TRIM_THRESHOLD_CHARS = 1000
+_TOOLLESS_MAX_ITERATIONS = 3
+
+# Prompt fragments shared by the tool and tool-less system prompts
+_PROMPT_INTRO = sys.intern(
+    "You are a Deep Thinking AI Assistant.\n"
+    "Your goal is to answer the user's question by performing a multi-step reasoning process."
+)
+_PROMPT_FORMAT_HEADER = sys.intern(
+    "Output Format:\n"
+    "You MUST structure your response as follows:\n"
+    "\n"
+    "<thinking>\n"
+    "Your reasoning process here.\n"
+    "</thinking>"
+)
+_PROMPT_FINAL_ANSWER_RULES = sys.intern(
+    "When you are ready to give the final answer:\n"
+    '<ready_to_answer confidence="0.0-1.0">\n'
+    "Your final answer here.\n"
+    "</ready_to_answer>\n"
+    "\n"
+    "CRITICAL INSTRUCTIONS:\n"
+    "1. Do NOT include the final answer inside <thinking> tags. "
+    "The <thinking> tag is ONLY for reasoning and planning.\n"
+    "2. If you have enough information to answer, you MUST use the <ready_to_answer> tag immediately.\n"
+    "3. Do not loop unnecessarily.\n"
+)
+
+
+def _as_async_callback(callback: Optional[Callable[..., Any]]) -> Optional[Callable[..., Any]]:
+    """Resolve a sync or async callback once into an awaitable invoker."""
+    if callback is None:
+        return None
+    if asyncio.iscoroutinefunction(callback):
+        return callback
+
+    async def _invoke(*args: Any) -> Any:
+        return callback(*args)
+
+    return _invoke
+
+
+_STREAM_DONE = object()
+
+
+async def _buffered(source: AsyncIterator[Any], n: int = 8) -> AsyncIterator[Any]:
+    """
+    Prefetch up to ``n`` items from ``source`` in a background task so the
+    producer keeps streaming while the consumer awaits its callbacks.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=n)
+
+    async def _produce() -> None:
+        try:
+            async for item in source:
+                await queue.put(item)
+        except Exception as exc:  # forwarded to the consumer
+            await queue.put(exc)
+        else:
+            await queue.put(_STREAM_DONE)
+
+    producer = asyncio.create_task(_produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _STREAM_DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        if not producer.done():
+            producer.cancel()
+            try:
+                await producer
+            except (asyncio.CancelledError, Exception):
+                pass
+        # Release the upstream (e.g. an httpx stream context) now, not at GC time
+        if hasattr(source, "aclose"):
+            try:
+                await source.aclose()
+            except Exception:
+                pass
+
+
+def _decode_action_json(text: str, start: int) -> Any:
+    """Decode the JSON payload of an <action> block beginning at ``start``."""
+    if _orjson is not None:
+        # Fast path: the payload usually ends at the last closing bracket
+        end = max(text.rfind("}"), text.rfind("]")) + 1
+        if end > start:
+            try:
+                return _orjson.loads(text[start:end])
+            except _orjson.JSONDecodeError:
+                pass
+    obj, _ = _JSON_DECODER.raw_decode(text, start)
+    return obj
+
+
+def _truncate(text: str, limit: int) -> str:
+    text = text.strip()
+    return text if len(text) <= limit else text[:limit] + "..."
+
+@dataclass(slots=True)
 class ThinkingStep:
     """Represents a single step in the thinking process."""
     iteration: int
@@ -18,10 +146,10 @@ class ThinkingStep:
     action: Optional[str]  # Tool call JSON string or description
     action_result: Optional[str]  # Result from the tool
     self_correction: Optional[str]  # Any self-correction made during this step
-    timestamp: datetime = datetime.now()
+    timestamp: datetime = field(default_factory=datetime.now)
     status: str = "thinking" # thinking, calling_tool, analyzing, done, error
 
-@dataclass
+@dataclass(slots=True)
 class DeepThinkResult:
     """The final result of the deep thinking process."""
     final_answer: str
@@ -45,14 +173,39 @@ class DeepThinkAgent:
         on_thinking: Optional[Callable[[ThinkingStep], Any]] = None,
         on_thinking_delta: Optional[Callable[[int, str], Any]] = None,  # (iteration, delta_text) -> None
         on_final_delta: Optional[Callable[[str], Any]] = None,  # (delta_text) -> None
+        context_window_turns: int = 4,  # recent assistant/user turn pairs kept verbatim
+        max_history_chars: int = 16000,  # character budget for turns after the original query
+        final_stream_chunk_size: int = 64,  # characters per final-answer delta
+        final_stream_delay: float = 0.0,  # optional pause between final-answer deltas
     ):
         self.llm_client = llm_client
+        self._supports_stream = hasattr(llm_client, "stream_chat_async")
+        logger.info(f"[DEEP_THINK] LLM streaming check: has_stream_chat_async={self._supports_stream}")
         self.available_tools = available_tools
         self.tool_executor = tool_executor
         self.max_iterations = max_iterations
         self.on_thinking = on_thinking
         self.on_thinking_delta = on_thinking_delta
         self.on_final_delta = on_final_delta
+        self.context_window_turns = context_window_turns
+        self.max_history_chars = max_history_chars
+        self.final_stream_chunk_size = max(1, final_stream_chunk_size)
+        self.final_stream_delay = final_stream_delay
+        self._invoke_on_thinking = _as_async_callback(on_thinking)
+        self._invoke_on_thinking_delta = _as_async_callback(on_thinking_delta)
+        self._invoke_on_final_delta = _as_async_callback(on_final_delta)
+        self._last_notified_state: Optional[tuple] = None
+
+    @property
+    def available_tools(self) -> List[str]:
+        return self._available_tools
+
+    @available_tools.setter
+    def available_tools(self, tools: List[str]) -> None:
+        # Tool lookup set and system prompt are derived from the tool list
+        self._available_tools = list(tools)
+        self._tool_set = frozenset(self._available_tools)
+        self._system_prompt = self._build_system_prompt()
 
     async def think(self, user_query: str, context: Optional[Dict[str, Any]] = None) -> DeepThinkResult:
         """
@@ -61,9 +214,10 @@ class DeepThinkAgent:
         context = context or {}
         thinking_steps: List[ThinkingStep] = []
         tools_used: List[str] = []
+        tools_used_set: set = set()
+        self._last_notified_state = None
         
-        # Initial system prompt construction
-        system_prompt = self._build_system_prompt()
+        system_prompt = self._system_prompt
         
         messages = [
             {"role": "system", "content": system_prompt},
@@ -76,7 +230,13 @@ class DeepThinkAgent:
         
         logger.info(f"Starting DeepThink for query: {user_query[:50]}...")
 
-        while iteration < self.max_iterations:
+        # Without tools there is nothing new to gather, so cap the reasoning loop
+        max_iterations = (
+            self.max_iterations if self._tool_set
+            else min(self.max_iterations, _TOOLLESS_MAX_ITERATIONS)
+        )
+
+        while iteration < max_iterations:
             iteration += 1
             
             try:
@@ -87,7 +247,6 @@ class DeepThinkAgent:
                     action=None,
                     action_result=None,
                     self_correction=None,
-                    timestamp=datetime.now(),
                     status="thinking"
                 )
                 
@@ -95,23 +254,30 @@ class DeepThinkAgent:
                 if self.on_thinking:
                     await self._safe_callback(current_step)
 
+                self._trim_history(messages)
+
                 # Use streaming LLM call to get response token by token
                 response_text = ""
                 
-                # Check if LLM client supports streaming
-                has_stream = hasattr(self.llm_client, 'stream_chat_async')
-                logger.info(f"[DEEP_THINK] LLM streaming check: has_stream_chat_async={has_stream}")
-                
-                if has_stream:
-                    logger.info("[DEEP_THINK] Using streaming LLM call")
-                    async for delta in self.llm_client.stream_chat_async(prompt="", messages=messages):
-                        response_text += delta
-                        # Send delta to frontend
-                        if self.on_thinking_delta:
-                            await self._safe_delta_callback(iteration, delta)
+                if self._supports_stream:
+                    stream = _buffered(
+                        self.llm_client.stream_chat_async(prompt="", messages=messages), n=8
+                    )
+                    # Closing the buffered stream cancels the upstream request on early exit
+                    async with aclosing(stream):
+                        async for delta in stream:
+                            response_text += delta
+                            # Send delta to frontend
+                            if self.on_thinking_delta:
+                                await self._safe_delta_callback(iteration, delta)
+                            # Stop as soon as the final answer is complete; trailing tokens are unused
+                            tail = response_text[-(len(delta) + len(_READY_CLOSE_TAG)):]
+                            if _READY_CLOSE_TAG in tail:
+                                logger.debug("[DEEP_THINK] Final answer closed mid-stream, stopping early")
+                                break
                 else:
                     # Fallback to non-streaming
-                    logger.info("[DEEP_THINK] Fallback to non-streaming LLM call")
+                    logger.debug("[DEEP_THINK] Fallback to non-streaming LLM call")
                     response_text = await self.llm_client.chat_async(prompt="", messages=messages, temperature=0.7)
 
                 # Parse response
@@ -130,10 +296,12 @@ class DeepThinkAgent:
                     
                     # Stream final answer if callback provided
                     if self.on_final_delta and final_answer:
-                        # Send final answer as stream
-                        for char in final_answer:
-                            await self._safe_final_delta_callback(char)
-                            await asyncio.sleep(0.01)  # Small delay for visual effect
+                        # Send final answer as stream in fixed-size chunks
+                        chunk_size = self.final_stream_chunk_size
+                        for i in range(0, len(final_answer), chunk_size):
+                            await self._safe_final_delta_callback(final_answer[i:i + chunk_size])
+                            if self.final_stream_delay > 0:
+                                await asyncio.sleep(self.final_stream_delay)
                     break
                 
                 # Handle Action
@@ -143,24 +311,30 @@ class DeepThinkAgent:
                     if self.on_thinking:
                         await self._safe_callback(current_step)
                         
-                    tool_name = parsed.get("tool_name")
-                    tool_params = parsed.get("tool_params")
-                    
-                    if tool_name not in self.available_tools:
-                        current_step.action_result = f"Error: Tool '{tool_name}' is not available."
-                    else:
-                        if tool_name not in tools_used:
+                    tool_calls = parsed.get("tool_calls") or [
+                        (parsed.get("tool_name"), parsed.get("tool_params"))
+                    ]
+                    for tool_name, _ in tool_calls:
+                        if tool_name in self._tool_set and tool_name not in tools_used_set:
+                            tools_used_set.add(tool_name)
                             tools_used.append(tool_name)
-                        try:
-                            # Execute tool
-                            result = await self.tool_executor(tool_name, tool_params)
-                            current_step.action_result = str(result)
-                        except Exception as e:
-                            current_step.action_result = f"Error executing tool: {str(e)}"
+
+                    # Independent tool calls from one action block run concurrently
+                    results = await asyncio.gather(
+                        *(self._run_tool(name, params) for name, params in tool_calls)
+                    )
+                    if len(results) == 1:
+                        current_step.action_result = results[0]
+                    else:
+                        current_step.action_result = "\n\n".join(
+                            f"[{idx}] {name}: {res}"
+                            for idx, ((name, _), res) in enumerate(zip(tool_calls, results), start=1)
+                        )
                     
                     # Update conversation history with result
                     messages.append({"role": "assistant", "content": response_text})
                     messages.append({"role": "user", "content": f"Tool Output: {current_step.action_result}"})
+                    self._compact_history(messages)
                     
                     current_step.status = "analyzing"
                     # Update step with action result
@@ -174,6 +348,7 @@ class DeepThinkAgent:
                         await self._safe_callback(current_step)
                     messages.append({"role": "assistant", "content": response_text})
                     messages.append({"role": "user", "content": self._get_next_step_prompt(iteration)})
+                    self._compact_history(messages)
 
             except Exception as e:
                 logger.error(f"Error in deep thinking loop: {e}")
@@ -196,42 +371,112 @@ class DeepThinkAgent:
             thinking_summary=summary
         )
 
+    async def _run_tool(self, tool_name: Optional[str], tool_params: Optional[Dict[str, Any]]) -> str:
+        """Execute a single tool call, returning its result or an error string."""
+        if tool_name not in self._tool_set:
+            return f"Error: Tool '{tool_name}' is not available."
+        try:
+            result = await self.tool_executor(tool_name, tool_params)
+            return str(result)
+        except Exception as e:
+            return f"Error executing tool: {str(e)}"
+
     async def _safe_callback(self, step: ThinkingStep):
-        if self.on_thinking:
+        if self._invoke_on_thinking:
+            # Skip notifications that would repeat the last reported step state;
+            # the fields are immutable strings, so keeping them for comparison is
+            # cheap and never confuses two different thoughts
+            state = (
+                step.iteration,
+                step.status,
+                step.thought,
+                step.action,
+                step.action_result,
+            )
+            if state == self._last_notified_state:
+                return
+            self._last_notified_state = state
             try:
-                if asyncio.iscoroutinefunction(self.on_thinking):
-                    await self.on_thinking(step)
-                else:
-                    self.on_thinking(step)
+                await self._invoke_on_thinking(step)
             except Exception as e:
                 logger.error(f"Error in on_thinking callback: {e}")
 
     async def _safe_delta_callback(self, iteration: int, delta: str):
-        if self.on_thinking_delta:
+        if self._invoke_on_thinking_delta:
             try:
-                if asyncio.iscoroutinefunction(self.on_thinking_delta):
-                    await self.on_thinking_delta(iteration, delta)
-                else:
-                    self.on_thinking_delta(iteration, delta)
+                await self._invoke_on_thinking_delta(iteration, delta)
             except Exception as e:
                 logger.error(f"Error in on_thinking_delta callback: {e}")
 
     async def _safe_final_delta_callback(self, delta: str):
-        if self.on_final_delta:
+        if self._invoke_on_final_delta:
             try:
-                if asyncio.iscoroutinefunction(self.on_final_delta):
-                    await self.on_final_delta(delta)
-                else:
-                    self.on_final_delta(delta)
+                await self._invoke_on_final_delta(delta)
             except Exception as e:
                 logger.error(f"Error in on_final_delta callback: {e}")
 
+    def _compact_history(self, messages: List[Dict[str, str]]) -> None:
+        """
+        Collapse turns older than the rolling window into a brief appended to
+        the original query message. Keeps the original query and the last
+        ``context_window_turns`` assistant/user pairs so the payload stays bounded.
+        The system prompt is left byte-identical so provider prefix caching keeps
+        working, and the brief is not sent as a separate mid-conversation system
+        message, since several OpenAI-compatible providers reject or ignore those.
+        """
+        keep = 2 * self.context_window_turns
+        if keep <= 0 or len(messages) <= keep + 2:
+            return
+
+        brief_parts: List[str] = []
+        for msg in messages[2:-keep]:
+            content = msg.get("content") or ""
+            if msg.get("role") == "assistant":
+                thinking_match = _THINKING_RE.search(content) if "<thinking>" in content else None
+                if thinking_match and thinking_match.group(1).strip():
+                    brief_parts.append(
+                        f"- Thought: {_truncate(thinking_match.group(1), _BRIEF_ITEM_CHARS)}"
+                    )
+            elif content.startswith("Tool Output:"):
+                brief_parts.append(f"- {_truncate(content, _BRIEF_ITEM_CHARS)}")
+        del messages[2:-keep]
+
+        query, _, prior_brief = messages[1]["content"].partition(_PRIOR_FINDINGS_MARKER)
+        if prior_brief == _NO_FINDINGS:
+            prior_brief = ""
+        brief = "\n".join(part for part in (prior_brief, *brief_parts) if part)
+        messages[1]["content"] = f"{query}{_PRIOR_FINDINGS_MARKER}{brief or _NO_FINDINGS}"
+
+    def _trim_history(self, messages: List[Dict[str, str]]) -> None:
+        """
+        Keep the turns after the original query within ``max_history_chars`` by
+        replacing the oldest oversized tool outputs with a short placeholder.
+        The most recent turn pair is always sent in full.
+        """
+        if self.max_history_chars <= 0:
+            return
+        history = messages[2:-2]
+        total = sum(len(m.get("content") or "") for m in messages[2:])
+        if total <= self.max_history_chars:
+            return
+
+        for msg in history:
+            content = msg.get("content") or ""
+            if len(content) <= _TRIM_THRESHOLD_CHARS or not content.startswith("Tool Output:"):
+                continue
+            msg["content"] = f"Tool Output: [truncated tool output, {len(content)} chars]"
+            total -= len(content) - len(msg["content"])
+            if total <= self.max_history_chars:
+                break
+
     def _build_system_prompt(self) -> str:
         """Constructs the system prompt for the Deep Think Agent."""
+        if not self.available_tools:
+            return self._build_toolless_system_prompt()
+
         tools_desc = "\n".join([f"- {t}" for t in self.available_tools])
         
-        return f"""You are a Deep Thinking AI Assistant.
-Your goal is to answer the user's question by performing a multi-step reasoning process.
+        return f"""{_PROMPT_INTRO}
 You must NOT answer immediately. Instead, you should:
 1. Analyze the user's request.
 2. Think step-by-step about how to approach the problem.
@@ -242,28 +487,29 @@ You must NOT answer immediately. Instead, you should:
 Available Tools:
 {tools_desc}
 
-Output Format:
-You MUST structure your response as follows:
-
-<thinking>
-Your reasoning process here.
-</thinking>
+{_PROMPT_FORMAT_HEADER}
 
 If you need to call a tool:
 <action>
 {{"tool": "tool_name", "params": {{"param1": "value1"}}}}
 </action>
 
-When you are ready to give the final answer:
-<ready_to_answer confidence="0.0-1.0">
-Your final answer here.
-</ready_to_answer>
+To call several independent tools at once, use a JSON array inside a single <action>:
+<action>
+[{{"tool": "tool_a", "params": {{}}}}, {{"tool": "tool_b", "params": {{}}}}]
+</action>
+
+{_PROMPT_FINAL_ANSWER_RULES}"""
+
+    def _build_toolless_system_prompt(self) -> str:
+        """Shorter prompt for pure reasoning mode, without the tool/action schema."""
+        return f"""{_PROMPT_INTRO}
+Analyze the request, think step-by-step, reflect on your reasoning, and then provide the final answer.
+No tools are available in this mode.
+
+{_PROMPT_FORMAT_HEADER}
 
-CRITICAL INSTRUCTIONS:
-1. Do NOT include the final answer inside <thinking> tags. The <thinking> tag is ONLY for reasoning and planning.
-2. If you have enough information to answer, you MUST use the <ready_to_answer> tag immediately.
-3. Do not loop unnecessarily.
-"""
+{_PROMPT_FINAL_ANSWER_RULES}"""
 
     def _get_next_step_prompt(self, iteration: int) -> str:
         """Generate prompt for the next step, encouraging completion if steps are getting long."""
@@ -284,33 +530,59 @@ CRITICAL INSTRUCTIONS:
             "tool_name": None,
             "tool_params": None,
             "action_str": None,
+            "tool_calls": [],
         }
         
-        # Extract thinking
-        import re
-        thinking_match = re.search(r'<thinking>(.*?)</thinking>', response, re.DOTALL)
-        if thinking_match:
-            result["thought"] = thinking_match.group(1).strip()
-        
-        # Check for final answer
-        ready_match = re.search(r'<ready_to_answer\s+confidence=["\']?([\d.]+)["\']?>(.*?)</ready_to_answer>', response, re.DOTALL)
-        if ready_match:
-            result["is_final"] = True
-            result["confidence"] = float(ready_match.group(1))
-            result["final_answer"] = ready_match.group(2).strip()
+        # Cheap substring prefilter: skip the regex scan when no tag is present
+        if not any(tag in response for tag in _RESPONSE_TAGS):
             return result
-        
-        # Check for action
-        action_match = re.search(r'<action>(.*?)</action>', response, re.DOTALL)
-        if action_match:
-            action_str = action_match.group(1).strip()
+
+        thought = None
+        action_str = None
+        for match in _PARSE_RE.finditer(response):
+            if match.group("th") is not None:
+                if thought is None:
+                    thought = match.group("th").strip()
+            elif match.group("act") is not None:
+                if action_str is None:
+                    action_str = match.group("act").strip()
+            elif not result["is_final"]:
+                result["is_final"] = True
+                result["final_answer"] = match.group("final").strip()
+                conf_match = _CONFIDENCE_RE.search(match.group("attrs"))
+                try:
+                    result["confidence"] = float(conf_match.group(1)) if conf_match else 0.8
+                except ValueError:
+                    result["confidence"] = 0.8
+
+        if thought is not None:
+            result["thought"] = thought
+
+        # A final answer takes precedence over any action in the same response
+        if result["is_final"]:
+            return result
+
+        # Actions are meaningless without tools; treat such responses as pure thinking
+        if action_str is not None and self._tool_set:
             result["action_str"] = action_str
             try:
-                action_obj = json.loads(action_str)
-                result["tool_name"] = action_obj.get("tool")
-                result["tool_params"] = action_obj.get("params", {})
+                # Decode from the first bracket so markdown fences need no pre-cleaning
+                starts = [i for i in (action_str.find("{"), action_str.find("[")) if i >= 0]
+                if not starts:
+                    raise json.JSONDecodeError("No JSON object found", action_str, 0)
+                action_obj = _decode_action_json(action_str, min(starts))
+                # Accept either a single call object or a list of independent calls
+                calls = action_obj if isinstance(action_obj, list) else [action_obj]
+                tool_calls = [
+                    (call.get("tool"), call.get("params", {}))
+                    for call in calls
+                    if isinstance(call, dict)
+                ]
+                if tool_calls:
+                    result["tool_name"], result["tool_params"] = tool_calls[0]
+                    result["tool_calls"] = tool_calls
             except json.JSONDecodeError:
-                logger.warning(f"Failed to parse action JSON: {action_str}")
+                logger.warning("Failed to parse action JSON: %s", action_str[:200])
         
         return result
 
@@ -15,6 +15,8 @@ from ...models import EvaluationConfig, EvaluationDimensions, EvaluationResult
 
 logger = logging.getLogger(__name__)
 
+_JSON_DECODER = json.JSONDecoder()
+
 
 class BaseEvaluator(ABC):
     """Base class for all evaluators with common functionality"""
@@ -62,15 +64,12 @@ class BaseEvaluator(ABC):
     ) -> Optional[Dict[str, Any]]:
         """Parse JSON from LLM response text"""
 
-        # Extract JSON block
+        # Decode the first JSON object in place; trailing chatter is ignored
         json_start = result_text.find("{")
-        json_end = result_text.rfind("}") + 1
-
-        if json_start >= 0 and json_end > json_start:
-            json_text = result_text[json_start:json_end]
 
+        if json_start >= 0:
             try:
-                parsed_data = json.loads(json_text)
+                parsed_data, _ = _JSON_DECODER.raw_decode(result_text, json_start)
 
                 # Validate required fields if specified
                 if required_fields:
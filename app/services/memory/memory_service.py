@@ -8,7 +8,7 @@ import json
 import logging
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from ...database import get_db
 from ...llm import get_default_client
@@ -28,6 +28,14 @@ from ..embeddings import get_embeddings_service
 
 logger = logging.getLogger(__name__)
 
+_INSERT_MEMORY_SQL = """
+    INSERT INTO memories (
+        id, content, memory_type, importance, keywords, context, tags,
+        related_task_id, links, created_at, last_accessed, retrieval_count,
+        evolution_history, embedding_generated, embedding_model
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
 
 class IntegratedMemoryService:
     """集成记忆服务 - 复用现有基础设施"""
@@ -93,37 +101,7 @@ class IntegratedMemoryService:
     async def save_memory(self, request: SaveMemoryRequest) -> SaveMemoryResponse:
         """保存记忆到系统中"""
         try:
-            # 生成记忆ID
-            memory_id = str(uuid.uuid4())
-
-            # 分析内容生成元数据（如果未提供）
-            keywords = request.keywords or []
-            context = request.context or "General"
-            tags = request.tags or []
-
-            # 如果缺少元数据，使用LLM分析
-            if not keywords or context == "General" or not tags:
-                analysis = await self._analyze_content(request.content)
-                if not keywords:
-                    keywords = analysis.get("keywords", [])
-                if context == "General":
-                    context = analysis.get("context", "General")
-                if not tags:
-                    tags = analysis.get("tags", [])
-
-            # 创建记忆笔记
-            memory_note = MemoryNote(
-                id=memory_id,
-                content=request.content,
-                memory_type=request.memory_type,
-                importance=request.importance,
-                keywords=keywords,
-                context=context,
-                tags=tags,
-                related_task_id=request.related_task_id,
-                created_at=datetime.now(),
-                last_accessed=datetime.now(),
-            )
+            memory_note = await self._build_memory_note(request)
 
             # 保存到数据库
             await self._store_memory(memory_note)
@@ -135,22 +113,116 @@ class IntegratedMemoryService:
             # 记忆进化处理
             await self._process_memory_evolution(memory_note)
 
-            return SaveMemoryResponse(
-                memory_id=memory_id,
-                task_id=request.related_task_id,
-                memory_type=request.memory_type,
-                content=request.content,
-                created_at=memory_note.created_at,
-                embedding_generated=embedding_generated,
-                keywords=keywords,
-                context=context,
-                tags=tags,
-            )
+            return self._build_save_response(request, memory_note)
 
         except Exception as e:
             logger.error(f"Failed to save memory: {e}")
             raise
 
+    async def bulk_save(self, requests: Sequence[SaveMemoryRequest]) -> List[SaveMemoryResponse]:
+        """批量保存记忆，所有记忆行在同一个事务中写入
+
+        整批写入失败时逐条重试，返回结果只包含实际保存成功的记忆。
+        """
+        try:
+            memory_notes = [await self._build_memory_note(request) for request in requests]
+            if not memory_notes:
+                return []
+
+            # 一次请求批量生成全部嵌入向量
+            embedding_rows = []
+            try:
+                embeddings = self.embeddings_service.get_embeddings(
+                    [self._build_embedding_text(memory_note) for memory_note in memory_notes]
+                )
+            except Exception as e:
+                logger.error(f"Failed to generate embeddings for memory batch: {e}")
+                embeddings = []
+            for memory_note, embedding in zip(memory_notes, embeddings):
+                if embedding:
+                    memory_note.embedding_generated = True
+                    memory_note.embedding_model = "embedding-2"
+                    embedding_rows.append((memory_note.id, json.dumps(embedding), "embedding-2"))
+
+            # 单个事务写入全部记忆行和向量，只提交一次；
+            # 整批失败时（如某一行违反约束）回退为逐条写入，只跳过出错的记忆
+            saved = list(zip(requests, memory_notes))
+            try:
+                self._write_memory_rows(memory_notes, embedding_rows)
+            except Exception as e:
+                logger.warning(f"Batch memory write failed, saving one by one: {e}")
+                embedding_by_id = {row[0]: row for row in embedding_rows}
+                saved = []
+                for request, memory_note in zip(requests, memory_notes):
+                    embedding_row = embedding_by_id.get(memory_note.id)
+                    try:
+                        self._write_memory_rows(
+                            [memory_note], [embedding_row] if embedding_row else []
+                        )
+                    except Exception as row_error:
+                        logger.error(f"Failed to save memory {memory_note.id}: {row_error}")
+                        continue
+                    saved.append((request, memory_note))
+
+            responses = []
+            for request, memory_note in saved:
+                await self._process_memory_evolution(memory_note)
+                responses.append(self._build_save_response(request, memory_note))
+
+            return responses
+
+        except Exception as e:
+            logger.error(f"Failed to bulk save memories: {e}")
+            raise
+
+    async def _build_memory_note(self, request: SaveMemoryRequest) -> MemoryNote:
+        """根据请求构建记忆笔记（必要时使用LLM补全元数据）"""
+        # 生成记忆ID
+        memory_id = str(uuid.uuid4())
+
+        # 分析内容生成元数据（如果未提供）
+        keywords = request.keywords or []
+        context = request.context or "General"
+        tags = request.tags or []
+
+        # 如果缺少元数据，使用LLM分析
+        if not keywords or context == "General" or not tags:
+            analysis = await self._analyze_content(request.content)
+            if not keywords:
+                keywords = analysis.get("keywords", [])
+            if context == "General":
+                context = analysis.get("context", "General")
+            if not tags:
+                tags = analysis.get("tags", [])
+
+        # 创建记忆笔记
+        return MemoryNote(
+            id=memory_id,
+            content=request.content,
+            memory_type=request.memory_type,
+            importance=request.importance,
+            keywords=keywords,
+            context=context,
+            tags=tags,
+            related_task_id=request.related_task_id,
+            created_at=datetime.now(),
+            last_accessed=datetime.now(),
+        )
+
+    @staticmethod
+    def _build_save_response(request: SaveMemoryRequest, memory_note: MemoryNote) -> SaveMemoryResponse:
+        return SaveMemoryResponse(
+            memory_id=memory_note.id,
+            task_id=request.related_task_id,
+            memory_type=request.memory_type,
+            content=request.content,
+            created_at=memory_note.created_at,
+            embedding_generated=memory_note.embedding_generated,
+            keywords=memory_note.keywords,
+            context=memory_note.context,
+            tags=memory_note.tags,
+        )
+
     async def query_memory(self, request: QueryMemoryRequest) -> QueryMemoryResponse:
         """查询记忆"""
         try:
@@ -265,37 +337,54 @@ Return the analysis result in JSON format:
 
         return {"keywords": keywords[:5], "context": context, "tags": tags}
 
+    def _write_memory_rows(
+        self, memory_notes: Sequence[MemoryNote], embedding_rows: Sequence[Tuple[Any, ...]]
+    ) -> None:
+        """在单个事务中写入记忆行及其嵌入向量，失败时整体回滚"""
+        with get_db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                _INSERT_MEMORY_SQL,
+                [self._memory_row(memory_note) for memory_note in memory_notes],
+            )
+            if embedding_rows:
+                conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO memory_embeddings
+                    (memory_id, embedding_vector, embedding_model, updated_at)
+                    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                """,
+                    embedding_rows,
+                )
+            conn.commit()
+
     async def _store_memory(self, memory_note: MemoryNote):
         """将记忆存储到数据库"""
         with get_db() as conn:
-            conn.execute(
-                """
-                INSERT INTO memories (
-                    id, content, memory_type, importance, keywords, context, tags,
-                    related_task_id, links, created_at, last_accessed, retrieval_count,
-                    evolution_history, embedding_generated, embedding_model
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    memory_note.id,
-                    memory_note.content,
-                    memory_note.memory_type.value,
-                    memory_note.importance.value,
-                    json.dumps(memory_note.keywords),
-                    memory_note.context,
-                    json.dumps(memory_note.tags),
-                    memory_note.related_task_id,
-                    json.dumps(memory_note.links),
-                    memory_note.created_at,
-                    memory_note.last_accessed,
-                    memory_note.retrieval_count,
-                    json.dumps(memory_note.evolution_history),
-                    memory_note.embedding_generated,
-                    memory_note.embedding_model,
-                ),
-            )
+            conn.execute(_INSERT_MEMORY_SQL, self._memory_row(memory_note))
             conn.commit()
 
+    @staticmethod
+    def _memory_row(memory_note: MemoryNote) -> Tuple[Any, ...]:
+        """记忆笔记对应的memories表行"""
+        return (
+            memory_note.id,
+            memory_note.content,
+            memory_note.memory_type.value,
+            memory_note.importance.value,
+            json.dumps(memory_note.keywords),
+            memory_note.context,
+            json.dumps(memory_note.tags),
+            memory_note.related_task_id,
+            json.dumps(memory_note.links),
+            memory_note.created_at,
+            memory_note.last_accessed,
+            memory_note.retrieval_count,
+            json.dumps(memory_note.evolution_history),
+            memory_note.embedding_generated,
+            memory_note.embedding_model,
+        )
+
     async def _generate_embedding(self, memory_note: MemoryNote) -> bool:
         """为记忆生成嵌入向量"""
         try:
@@ -8,22 +8,25 @@ code. Use ``generate_experiment_card`` (tool) to create new cards from papers.
 from __future__ import annotations
 
 import logging
-from dataclasses import asdict, dataclass, field
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
-import yaml
-
 logger = logging.getLogger(__name__)
 
 # Project root and data directory
-_PROJECT_ROOT = Path(__file__).parent.parent.parent.resolve()
+_PROJECT_ROOT = Path(__file__).parent.parent.parent
 _DATA_DIR = _PROJECT_ROOT / "data"
 _CARD_FILENAME = "card.yaml"
 
 # In-memory caches for loaded cards/paths
-_CARD_CACHE: Dict[str, "ExperimentCard"] = {}
+# experiment_id -> (card mtime_ns, hydrated card); entries are revalidated by mtime
+_CARD_CACHE: Dict[str, Tuple[int, "ExperimentCard"]] = {}
 _CARD_PATH_CACHE: Dict[str, Path] = {}
+# Listing metadata: experiment_id -> (card mtime_ns, title, card path)
+_CARD_LISTING_CACHE: Dict[str, Tuple[int, Optional[str], Path]] = {}
 
 
 @dataclass
@@ -102,26 +105,59 @@ class ExperimentCard:
     notes: List[str] = field(default_factory=list)
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        """Serialize to plain containers. Top-level dicts and lists are fresh
+        copies, so callers can edit them without touching the (possibly cached)
+        card; values nested deeper are shared."""
+        phage_system = self.phage_system
+        return {
+            "paper": dict(self.paper),
+            "experiment": dict(self.experiment),
+            "task": dict(self.task),
+            "phage_system": None
+            if phage_system is None
+            else {"phage": _fields_copy(phage_system.phage), "host": _fields_copy(phage_system.host)},
+            "assay": None if self.assay is None else _fields_copy(self.assay),
+            "dataset": dict(self.dataset),
+            "model": dict(self.model),
+            "metrics": [_fields_copy(metric) for metric in self.metrics],
+            "artifacts": dict(self.artifacts),
+            "constraints": dict(self.constraints),
+            "notes": list(self.notes),
+        }
+
+
+def _fields_copy(obj: Any) -> Dict[str, Any]:
+    """``vars(obj)`` with its list/dict field values copied one level deep."""
+    return {
+        key: list(value) if isinstance(value, list) else dict(value) if isinstance(value, dict) else value
+        for key, value in vars(obj).items()
+    }
+
+
+# Fields every card must define with a non-empty value
+_REQUIRED_CARD_PATHS: Tuple[Tuple[str, ...], ...] = (
+    ("paper", "title"),
+    ("experiment", "id"),
+    ("experiment", "name"),
+    ("task", "description"),
+)
+_REQUIRED_CARD_MESSAGES: Tuple[str, ...] = tuple(
+    f"Missing required field: {'/'.join(path)}" for path in _REQUIRED_CARD_PATHS
+)
 
 
 def _validate_card_dict(card_dict: Dict[str, Any]) -> List[str]:
     """Validate minimal required fields for a card."""
     errors: List[str] = []
-
-    def _require(path: Tuple[str, ...]) -> None:
+    for path, message in zip(_REQUIRED_CARD_PATHS, _REQUIRED_CARD_MESSAGES):
         cursor: Any = card_dict
         for key in path:
-            if not isinstance(cursor, dict) or key not in cursor or cursor[key] in (None, ""):
-                errors.append(f"Missing required field: {'/'.join(path)}")
-                return
-            cursor = cursor[key]
-
-    _require(("paper", "title"))
-    _require(("experiment", "id"))
-    _require(("experiment", "name"))
-    _require(("task", "description"))
-
+            if not isinstance(cursor, dict):
+                cursor = None
+                break
+            cursor = cursor.get(key)
+        if cursor is None or cursor == "":
+            errors.append(message)
     return errors
 
 
@@ -181,37 +217,78 @@ def _dict_to_card(card_dict: Dict[str, Any]) -> ExperimentCard:
     )
 
 
+@lru_cache(maxsize=1)
+def _yaml_loaders() -> Tuple[Any, Any, Any]:
+    """Import PyYAML on first card read/write; prefer the libyaml C bindings."""
+    import yaml
+
+    return (
+        yaml,
+        getattr(yaml, "CSafeLoader", yaml.SafeLoader),
+        getattr(yaml, "CSafeDumper", yaml.SafeDumper),
+    )
+
+
 def _load_card_yaml(path: Path) -> Dict[str, Any]:
-    content = path.read_text(encoding="utf-8")
-    return yaml.safe_load(content) or {}
+    yaml, loader, _ = _yaml_loaders()
+    with path.open("r", encoding="utf-8") as handle:
+        return yaml.load(handle, Loader=loader) or {}
+
+
+def _scan_card_paths(data_dir: Path) -> List[Tuple[str, Path, os.stat_result]]:
+    """Return (experiment_id, card_path, card_stat) for dirs containing a card."""
+    found: List[Tuple[str, Path, os.stat_result]] = []
+    try:
+        entries = os.scandir(data_dir)
+    except OSError:
+        return found
+    with entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            card_path = Path(entry.path) / _CARD_FILENAME
+            try:
+                found.append((entry.name, card_path, card_path.stat()))
+            except OSError:
+                continue
+    found.sort(key=lambda item: item[0])
+    return found
+
+
+def _card_path(experiment_id: str) -> Path:
+    """Return data/<experiment_id>/card.yaml, reusing the cached Path when known."""
+    card_path = _CARD_PATH_CACHE.get(experiment_id)
+    if card_path is None:
+        card_path = _DATA_DIR / experiment_id / _CARD_FILENAME
+        _CARD_PATH_CACHE[experiment_id] = card_path
+    return card_path
 
 
 def discover_experiments(data_dir: Path = _DATA_DIR) -> List[str]:
     """Return experiment IDs that contain a card.yaml."""
-    if not data_dir.exists():
-        return []
-    ids: List[str] = []
-    for entry in data_dir.iterdir():
-        if entry.is_dir() and (entry / _CARD_FILENAME).exists():
-            ids.append(entry.name)
-    return sorted(ids)
+    return [exp_id for exp_id, _, _ in _scan_card_paths(data_dir)]
 
 
 def list_experiment_cards(reload: bool = False) -> List[Dict[str, Any]]:
     """List available experiment cards with basic metadata."""
     result: List[Dict[str, Any]] = []
-    for exp_id in discover_experiments():
-        try:
-            card = load_experiment_card(exp_id, reload=reload)
-            result.append(
-                {
-                    "id": exp_id,
-                    "title": card.paper.get("title"),
-                    "path": str(_CARD_PATH_CACHE.get(exp_id, _DATA_DIR / exp_id / _CARD_FILENAME)),
-                }
-            )
-        except Exception as exc:  # pragma: no cover - defensive
-            logger.warning("Failed to load card for %s: %s", exp_id, exc)
+    for exp_id, card_path, card_stat in _scan_card_paths(_DATA_DIR):
+        card_path = _CARD_PATH_CACHE.setdefault(exp_id, card_path)
+        cached = _CARD_LISTING_CACHE.get(exp_id)
+        if cached is not None and not reload and cached[0] == card_stat.st_mtime_ns:
+            _, title, path = cached
+        else:
+            try:
+                # Parsed and validated like a load, so empty, unparsable or
+                # invalid cards are skipped, but not added to the card cache
+                title = _read_card(exp_id, card_path, card_stat).paper.get("title")
+            except Exception as exc:  # pragma: no cover - defensive
+                logger.warning("Failed to load card for %s: %s", exp_id, exc)
+                _CARD_LISTING_CACHE.pop(exp_id, None)
+                continue
+            path = card_path
+            _CARD_LISTING_CACHE[exp_id] = (card_stat.st_mtime_ns, title, path)
+        result.append({"id": exp_id, "title": title, "path": str(path)})
     return result
 
 
@@ -220,27 +297,35 @@ def load_experiment_card(experiment_id: str, reload: bool = False) -> Experiment
     if not experiment_id:
         raise ValueError("experiment_id is required")
 
-    if experiment_id in _CARD_CACHE and not reload:
-        return _CARD_CACHE[experiment_id]
-
-    card_path = _DATA_DIR / experiment_id / _CARD_FILENAME
-    if not card_path.exists():
-        raise FileNotFoundError(f"Card not found for experiment_id '{experiment_id}'. Expected at {card_path}")
+    card_path = _card_path(experiment_id)
     try:
-        if card_path.stat().st_size == 0:
-            raise ValueError(f"Card file is empty: {card_path}")
+        card_stat = os.stat(card_path)
+    except FileNotFoundError:
+        _CARD_PATH_CACHE.pop(experiment_id, None)
+        raise FileNotFoundError(f"Card not found for experiment_id '{experiment_id}'. Expected at {card_path}")
     except OSError:
         raise FileNotFoundError(f"Unable to access card for experiment_id '{experiment_id}' at {card_path}")
 
+    cached = _CARD_CACHE.get(experiment_id)
+    if cached is not None and not reload and cached[0] == card_stat.st_mtime_ns:
+        return cached[1]
+
+    card = _read_card(experiment_id, card_path, card_stat)
+    _CARD_CACHE[experiment_id] = (card_stat.st_mtime_ns, card)
+    return card
+
+
+def _read_card(experiment_id: str, card_path: Path, card_stat: os.stat_result) -> ExperimentCard:
+    """Parse and validate a card file whose stat the caller already has."""
+    if card_stat.st_size == 0:
+        raise ValueError(f"Card file is empty: {card_path}")
+
     card_dict = _load_card_yaml(card_path)
     errors = _validate_card_dict(card_dict)
     if errors:
         raise ValueError(f"Card validation failed for '{experiment_id}': {errors}")
 
-    card = _dict_to_card(card_dict)
-    _CARD_CACHE[experiment_id] = card
-    _CARD_PATH_CACHE[experiment_id] = card_path
-    return card
+    return _dict_to_card(card_dict)
 
 
 def save_experiment_card(experiment_id: str, card: ExperimentCard, overwrite: bool = False) -> Path:
@@ -248,15 +333,14 @@ def save_experiment_card(experiment_id: str, card: ExperimentCard, overwrite: bo
     if not experiment_id:
         raise ValueError("experiment_id is required")
 
-    exp_dir = _DATA_DIR / experiment_id
-    exp_dir.mkdir(parents=True, exist_ok=True)
-    card_path = exp_dir / _CARD_FILENAME
+    card_path = _card_path(experiment_id)
+    card_path.parent.mkdir(parents=True, exist_ok=True)
     if card_path.exists() and not overwrite:
         raise FileExistsError(f"Card already exists at {card_path}. Use overwrite=True to replace.")
 
+    yaml, _, dumper = _yaml_loaders()
     with card_path.open("w", encoding="utf-8") as f:
-        yaml.safe_dump(card.to_dict(), f, sort_keys=False, allow_unicode=True)
+        yaml.dump(card.to_dict(), f, Dumper=dumper, sort_keys=False, allow_unicode=True)
 
-    _CARD_CACHE[experiment_id] = card
-    _CARD_PATH_CACHE[experiment_id] = card_path
+    _CARD_CACHE[experiment_id] = (card_path.stat().st_mtime_ns, card)
     return card_path
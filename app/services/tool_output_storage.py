@@ -4,14 +4,22 @@ from __future__ import annotations
 
 import hashlib
 import json
+import os
+import re
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 from app.services.upload_storage import ensure_session_dir
 
+try:  # optional fast serializer for large tool results
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    _orjson = None
+
 
 MAX_OUTPUT_BYTES = 200 * 1024 * 1024
 MAX_SCHEMA_KEYS = 80
@@ -22,6 +30,14 @@ MAX_ARTIFACTS = 200
 MAX_SCAN_DEPTH = 5
 MAX_SCAN_ITEMS = 200
 
+# Longer strings are treated as text, not paths (PATH_MAX on Linux)
+_MAX_PATH_VALUE_CHARS = 4096
+# Only short strings go through the memoized check, to keep the cache small
+_PATH_CACHE_MAX_CHARS = 1024
+_PATH_SUFFIX_RE = re.compile(
+    r"\.(?:csv|tsv|json|txt|md|png|jpe?g|pdf|zip|fasta|fa|fastq|gz)\Z", re.IGNORECASE
+)
+
 
 @dataclass(frozen=True)
 class StoredToolOutput:
@@ -45,30 +61,35 @@ def store_tool_output(
     if not session_id:
         return None
 
-    session_root = ensure_session_dir(session_id)
-    outputs_root = session_root / "tool_outputs"
+    # Paths are joined as plain strings relative to the session root; this is
+    # the per-call hot path and the manifest stores the relative forms anyway.
+    session_root = os.fspath(ensure_session_dir(session_id))
     job_label = f"job_{job_id}" if job_id else "job_unknown"
     step_label = _build_step_label(action, tool_name)
-    output_dir = outputs_root / job_label / step_label
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    cleaned_result = _drop_callables(raw_result)
-    result_path = output_dir / "result.json"
-    _write_json(result_path, cleaned_result, compact=True)
+    output_rel = os.path.join("tool_outputs", job_label, step_label)
+    os.makedirs(os.path.join(session_root, output_rel), exist_ok=True)
 
-    size_bytes = result_path.stat().st_size
+    artifacts: List[str] = []
+    cleaned_result, preview = _clean_and_scan(raw_result, artifacts)
+    artifacts = artifacts[:MAX_ARTIFACTS]
+    result_rel = os.path.join(output_rel, "result.json")
+    # Size and digest come from the serialized bytes, so the file is never re-read
+    result_bytes = _dumps_json(cleaned_result, compact=True)
+    with open(os.path.join(session_root, result_rel), "wb") as handle:
+        handle.write(result_bytes)
+
+    size_bytes = len(result_bytes)
     too_large = size_bytes > MAX_OUTPUT_BYTES
-    result_hash = _hash_file(result_path)
+    result_hash = hashlib.sha256(result_bytes).hexdigest()
+    del result_bytes
 
     schema = _infer_schema(cleaned_result)
-    artifacts = _collect_artifacts(cleaned_result)
-    preview = _build_preview(cleaned_result)
-    preview_path = None
+    preview_rel = None
     if preview is not None:
-        preview_path = output_dir / "preview.json"
-        _write_json(preview_path, preview, compact=False)
+        preview_rel = os.path.join(output_rel, "preview.json")
+        _write_json(os.path.join(session_root, preview_rel), preview, compact=False)
 
-    manifest_path = output_dir / "manifest.json"
+    manifest_rel = os.path.join(output_rel, "manifest.json")
     manifest = {
         "session_id": session_id,
         "job_id": job_id,
@@ -77,7 +98,7 @@ def store_tool_output(
         "summary": summary,
         "stored_at": _utc_now(),
         "result": {
-            "path": _rel_path(result_path, session_root),
+            "path": result_rel,
             "size_bytes": size_bytes,
             "sha256": result_hash,
             "too_large_for_llm": too_large,
@@ -85,15 +106,16 @@ def store_tool_output(
         },
         "data_schema": schema,
         "artifacts": artifacts,
-        "preview_path": _rel_path(preview_path, session_root) if preview_path else None,
+        "preview_path": preview_rel,
     }
-    _write_json(manifest_path, manifest, compact=False)
+    _write_json(os.path.join(session_root, manifest_rel), manifest, compact=False)
 
+    _looks_like_path_value_cached.cache_clear()
     return StoredToolOutput(
-        output_dir=_rel_path(output_dir, session_root),
-        result_path=_rel_path(result_path, session_root),
-        manifest_path=_rel_path(manifest_path, session_root),
-        preview_path=_rel_path(preview_path, session_root) if preview_path else None,
+        output_dir=output_rel,
+        result_path=result_rel,
+        manifest_path=manifest_rel,
+        preview_path=preview_rel,
         size_bytes=size_bytes,
         too_large_for_llm=too_large,
     )
@@ -102,7 +124,7 @@ def store_tool_output(
 def _build_step_label(action: Dict[str, Any], tool_name: str) -> str:
     order = action.get("order")
     order_label = f"{order}" if isinstance(order, int) else "x"
-    unique = uuid4().hex[:6]
+    unique = uuid4().bytes[:3].hex()
     return f"step_{order_label}_{tool_name}_{unique}"
 
 
@@ -110,36 +132,38 @@ def _utc_now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def _rel_path(path: Optional[Path], root: Path) -> Optional[str]:
-    if path is None:
-        return None
-    try:
-        return str(path.relative_to(root))
-    except ValueError:
-        return str(path)
+def _write_json(path: str, payload: Any, *, compact: bool) -> None:
+    with open(path, "wb") as handle:
+        handle.write(_dumps_json(payload, compact=compact))
 
 
-def _write_json(path: Path, payload: Any, *, compact: bool) -> None:
+def _dumps_json(payload: Any, *, compact: bool) -> bytes:
+    if _orjson is not None:
+        # datetime and dataclass values go through _json_default, as with the
+        # stdlib encoder. Enum members are written as their value and NaN/inf
+        # as null, which keeps the files strict JSON.
+        option = (
+            _orjson.OPT_NON_STR_KEYS
+            | _orjson.OPT_PASSTHROUGH_DATETIME
+            | _orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+        if not compact:
+            option |= _orjson.OPT_INDENT_2
+        try:
+            return _orjson.dumps(payload, default=_json_default, option=option)
+        except _orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits; the stdlib encoder handles these
+            pass
     if compact:
-        with path.open("w", encoding="utf-8") as handle:
-            json.dump(
-                payload,
-                handle,
-                ensure_ascii=False,
-                separators=(",", ":"),
-                default=_json_default,
-            )
+        text = json.dumps(
+            payload,
+            ensure_ascii=False,
+            separators=(",", ":"),
+            default=_json_default,
+        )
     else:
-        with path.open("w", encoding="utf-8") as handle:
-            json.dump(payload, handle, ensure_ascii=False, indent=2, default=_json_default)
-
-
-def _hash_file(path: Path) -> str:
-    hasher = hashlib.sha256()
-    with path.open("rb") as handle:
-        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
-            hasher.update(chunk)
-    return hasher.hexdigest()
+        text = json.dumps(payload, ensure_ascii=False, indent=2, default=_json_default)
+    return text.encode("utf-8")
 
 
 def _json_default(value: Any) -> str:
@@ -170,6 +194,89 @@ def _drop_callables(value: Any) -> Any:
     return value
 
 
+def _clean_and_scan(
+    value: Any,
+    artifacts: Optional[List[str]],
+    *,
+    depth: int = MAX_SCAN_DEPTH,
+    preview: bool = True,
+) -> Tuple[Any, Optional[Any]]:
+    """Drop callables while building the preview and collecting artifact paths.
+
+    Returns ``(cleaned, preview)`` and appends path-like strings to
+    ``artifacts`` in traversal order. Passing ``artifacts=None`` or
+    ``preview=False`` switches that part off for the subtree; below
+    ``MAX_SCAN_DEPTH`` only the cleaning is done.
+    """
+    if depth <= 0:
+        return _drop_callables(value), None
+    if artifacts is not None and len(artifacts) >= MAX_ARTIFACTS:
+        artifacts = None
+    if artifacts is None and not preview:
+        return _drop_callables(value), None
+    if callable(value):
+        return None, None
+
+    if isinstance(value, dict):
+        cleaned: Dict[str, Any] = {}
+        preview_dict: Optional[Dict[str, Any]] = {} if preview else None
+        index = 0
+        for key, item in value.items():
+            if callable(item):
+                continue
+            scan_into = artifacts if index < MAX_SCAN_ITEMS else None
+            if (
+                scan_into is not None
+                and isinstance(item, str)
+                and _looks_like_path_key(str(key).lower())
+            ):
+                if item not in scan_into:
+                    scan_into.append(item)
+                scan_into = None
+            want_preview = preview_dict is not None and index < MAX_PREVIEW_ITEMS
+            cleaned[key], item_preview = _clean_and_scan(
+                item, scan_into, depth=depth - 1, preview=want_preview
+            )
+            if want_preview:
+                preview_dict[key] = item_preview
+            index += 1
+        return cleaned, preview_dict
+
+    if isinstance(value, (list, tuple)):
+        cleaned_list: List[Any] = []
+        preview_list: Optional[List[Any]] = [] if preview else None
+        for item in value:
+            if callable(item):
+                continue
+            index = len(cleaned_list)
+            want_preview = preview_list is not None and index < MAX_PREVIEW_ITEMS
+            cleaned_item, item_preview = _clean_and_scan(
+                item,
+                artifacts if index < MAX_SCAN_ITEMS else None,
+                depth=depth - 1,
+                preview=want_preview,
+            )
+            cleaned_list.append(cleaned_item)
+            if want_preview:
+                preview_list.append(item_preview)
+        return cleaned_list, preview_list
+
+    if isinstance(value, str):
+        if artifacts is not None and _is_artifact_path(value) and value not in artifacts:
+            artifacts.append(value)
+        if not preview:
+            return value, None
+        if len(value) > MAX_PREVIEW_STRING:
+            return value, value[: MAX_PREVIEW_STRING - 3] + "..."
+        return value, value
+
+    if not preview or value is None:
+        return value, None
+    if isinstance(value, (int, float, bool)):
+        return value, value
+    return value, str(value)
+
+
 def _clean_action(action: Dict[str, Any]) -> Dict[str, Any]:
     cleaned = dict(action)
     if "parameters" in cleaned:
@@ -180,110 +287,77 @@ def _clean_action(action: Dict[str, Any]) -> Dict[str, Any]:
 def _infer_schema(value: Any, depth: int = MAX_SCAN_DEPTH) -> Dict[str, Any]:
     if depth <= 0:
         return {"type": "unknown"}
-    if value is None:
-        return {"type": "null"}
-    if isinstance(value, bool):
-        return {"type": "boolean"}
-    if isinstance(value, int):
-        return {"type": "integer"}
-    if isinstance(value, float):
-        return {"type": "number"}
-    if isinstance(value, str):
-        return {"type": "string", "length": len(value)}
-    if isinstance(value, dict):
-        keys = list(value.keys())
+    handler = _SCHEMA_DISPATCH.get(type(value))
+    if handler is None:
+        # Subclasses of the built-in types take the slower isinstance route
+        for base in _SCHEMA_BASES:
+            if isinstance(value, base):
+                handler = _SCHEMA_DISPATCH[base]
+                break
+        else:
+            return {"type": type(value).__name__}
+    return handler(value, depth)
+
+
+def _schema_object(value: Dict[Any, Any], depth: int) -> Dict[str, Any]:
+    keys = list(value.keys())
+    field_schema: Dict[str, Any] = {}
+    for key in keys[:MAX_SCHEMA_KEYS]:
+        field_schema[key] = _infer_schema(value[key], depth=depth - 1)
+    return {
+        "type": "object",
+        "key_count": len(keys),
+        "keys": keys[:MAX_SCHEMA_KEYS],
+        "field_schema": field_schema,
+    }
+
+
+def _schema_array(value: List[Any], depth: int) -> Dict[str, Any]:
+    sample = value[:MAX_SCHEMA_ITEMS]
+    item_types = sorted({type(item).__name__ for item in sample})
+    schema: Dict[str, Any] = {
+        "type": "array",
+        "length": len(value),
+        "item_types": item_types,
+    }
+    if sample and all(isinstance(item, dict) for item in sample):
+        keys: List[str] = []
+        for item in sample:
+            for key in item.keys():
+                if key not in keys:
+                    keys.append(key)
+                    if len(keys) >= MAX_SCHEMA_KEYS:
+                        break
+            if len(keys) >= MAX_SCHEMA_KEYS:
+                break
         field_schema: Dict[str, Any] = {}
-        for key in keys[:MAX_SCHEMA_KEYS]:
-            field_schema[key] = _infer_schema(value[key], depth=depth - 1)
-        return {
+        for key in keys:
+            for item in sample:
+                if key in item:
+                    field_schema[key] = _infer_schema(
+                        item.get(key), depth=depth - 1
+                    )
+                    break
+        schema["item_schema"] = {
             "type": "object",
             "key_count": len(keys),
-            "keys": keys[:MAX_SCHEMA_KEYS],
+            "keys": keys,
             "field_schema": field_schema,
         }
-    if isinstance(value, list):
-        sample = value[:MAX_SCHEMA_ITEMS]
-        item_types = sorted({type(item).__name__ for item in sample})
-        schema: Dict[str, Any] = {
-            "type": "array",
-            "length": len(value),
-            "item_types": item_types,
-        }
-        if sample and all(isinstance(item, dict) for item in sample):
-            keys: List[str] = []
-            for item in sample:
-                for key in item.keys():
-                    if key not in keys:
-                        keys.append(key)
-                        if len(keys) >= MAX_SCHEMA_KEYS:
-                            break
-                if len(keys) >= MAX_SCHEMA_KEYS:
-                    break
-            field_schema: Dict[str, Any] = {}
-            for key in keys:
-                for item in sample:
-                    if key in item:
-                        field_schema[key] = _infer_schema(
-                            item.get(key), depth=depth - 1
-                        )
-                        break
-            schema["item_schema"] = {
-                "type": "object",
-                "key_count": len(keys),
-                "keys": keys,
-                "field_schema": field_schema,
-            }
-        return schema
-    return {"type": type(value).__name__}
-
-
-def _build_preview(value: Any, depth: int = MAX_SCAN_DEPTH) -> Optional[Any]:
-    if depth <= 0:
-        return None
-    if value is None:
-        return None
-    if isinstance(value, str):
-        if len(value) > MAX_PREVIEW_STRING:
-            return value[: MAX_PREVIEW_STRING - 3] + "..."
-        return value
-    if isinstance(value, (int, float, bool)):
-        return value
-    if isinstance(value, dict):
-        preview: Dict[str, Any] = {}
-        for key in list(value.keys())[:MAX_PREVIEW_ITEMS]:
-            preview[key] = _build_preview(value[key], depth=depth - 1)
-        return preview
-    if isinstance(value, list):
-        return [_build_preview(item, depth=depth - 1) for item in value[:MAX_PREVIEW_ITEMS]]
-    return str(value)
+    return schema
 
 
-def _collect_artifacts(value: Any) -> List[str]:
-    artifacts: List[str] = []
-    _scan_for_artifacts(value, artifacts, depth=0)
-    return artifacts[:MAX_ARTIFACTS]
-
-
-def _scan_for_artifacts(value: Any, artifacts: List[str], *, depth: int) -> None:
-    if depth >= MAX_SCAN_DEPTH or len(artifacts) >= MAX_ARTIFACTS:
-        return
-    if isinstance(value, str):
-        if _looks_like_path_value(value) and value not in artifacts:
-            artifacts.append(value)
-        return
-    if isinstance(value, dict):
-        for key, item in list(value.items())[:MAX_SCAN_ITEMS]:
-            key_lower = str(key).lower()
-            if isinstance(item, str) and _looks_like_path_key(key_lower):
-                if item not in artifacts:
-                    artifacts.append(item)
-                continue
-            _scan_for_artifacts(item, artifacts, depth=depth + 1)
-        return
-    if isinstance(value, list):
-        for item in value[:MAX_SCAN_ITEMS]:
-            _scan_for_artifacts(item, artifacts, depth=depth + 1)
-        return
+_SCHEMA_DISPATCH: Dict[type, Callable[[Any, int], Dict[str, Any]]] = {
+    type(None): lambda value, depth: {"type": "null"},
+    bool: lambda value, depth: {"type": "boolean"},
+    int: lambda value, depth: {"type": "integer"},
+    float: lambda value, depth: {"type": "number"},
+    str: lambda value, depth: {"type": "string", "length": len(value)},
+    dict: _schema_object,
+    list: _schema_array,
+}
+# isinstance order for subclasses; bool must precede int
+_SCHEMA_BASES = (bool, int, float, str, dict, list)
 
 
 def _looks_like_path_key(key: str) -> bool:
@@ -295,6 +369,8 @@ def _looks_like_path_key(key: str) -> bool:
 
 
 def _looks_like_path_value(value: str) -> bool:
+    if len(value) > _MAX_PATH_VALUE_CHARS:
+        return False
     if value.startswith(("http://", "https://")):
         return False
     if value.startswith(("s3://", "gs://")):
@@ -303,20 +379,15 @@ def _looks_like_path_value(value: str) -> bool:
         return True
     if "/" in value or "\\" in value:
         return True
-    extensions = (
-        ".csv",
-        ".tsv",
-        ".json",
-        ".txt",
-        ".md",
-        ".png",
-        ".jpg",
-        ".jpeg",
-        ".pdf",
-        ".zip",
-        ".fasta",
-        ".fa",
-        ".fastq",
-        ".gz",
-    )
-    return value.lower().endswith(extensions)
+    # Only the tail can hold a known suffix; ".fastq" is the longest
+    return _PATH_SUFFIX_RE.search(value, len(value) - 6) is not None
+
+
+# Tool results often repeat the same path strings across many fields
+_looks_like_path_value_cached = lru_cache(maxsize=4096)(_looks_like_path_value)
+
+
+def _is_artifact_path(value: str) -> bool:
+    if len(value) < _PATH_CACHE_MAX_CHARS:
+        return _looks_like_path_value_cached(value)
+    return _looks_like_path_value(value)
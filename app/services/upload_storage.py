@@ -7,6 +7,9 @@ from pathlib import Path
 
 UPLOAD_BASE_DIR = Path("data") / "information_sessions"
 
+# Session ids whose root directory has already been created by this process
+_ENSURED: set[str] = set()
+
 
 def get_session_root_dir(session_id: str) -> Path:
     return UPLOAD_BASE_DIR / f"session-{session_id}"
@@ -14,11 +17,14 @@ def get_session_root_dir(session_id: str) -> Path:
 
 def ensure_session_dir(session_id: str) -> Path:
     session_dir = get_session_root_dir(session_id)
-    session_dir.mkdir(parents=True, exist_ok=True)
+    if session_id not in _ENSURED:
+        session_dir.mkdir(parents=True, exist_ok=True)
+        _ENSURED.add(session_id)
     return session_dir
 
 
 def delete_session_storage(session_id: str) -> bool:
+    _ENSURED.discard(session_id)
     session_dir = get_session_root_dir(session_id)
     if not session_dir.exists():
         return False
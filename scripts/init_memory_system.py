@@ -29,11 +29,22 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-async def import_sample_knowledge():
-    """Import sample knowledge memories"""
-    memory_service = get_memory_service()
-    
-    sample_knowledge = [
+def _build_requests(memory_type, items):
+    """Build the save requests for one sample memory type"""
+    return tuple(
+        SaveMemoryRequest(
+            content=item["content"],
+            memory_type=memory_type,
+            importance=item["importance"],
+            tags=item["tags"],
+        )
+        for item in items
+    )
+
+
+_KNOWLEDGE_REQUESTS = _build_requests(
+    MemoryType.KNOWLEDGE,
+    [
         {
             "content": "Python is a high-level programming language known for its concise syntax and powerful features. Suitable for data analysis, machine learning, web development, and many other domains.",
             "tags": ["Python", "Programming Language", "Technology"],
@@ -59,33 +70,13 @@ async def import_sample_knowledge():
             "tags": ["FastAPI", "Web Framework", "Python"],
             "importance": ImportanceLevel.MEDIUM,
         },
-    ]
-    
-    saved_count = 0
-    for knowledge in sample_knowledge:
-        try:
-            request = SaveMemoryRequest(
-                content=knowledge["content"],
-                memory_type=MemoryType.KNOWLEDGE,
-                importance=knowledge["importance"],
-                tags=knowledge["tags"],
-            )
-            
-            response = await memory_service.save_memory(request)
-            logger.info(f"Saved knowledge memory: {response.memory_id}")
-            saved_count += 1
-            
-        except Exception as e:
-            logger.error(f"Failed to save knowledge memory: {e}")
-    
-    return saved_count
+    ],
+)
 
 
-async def import_sample_experiences():
-    """Import sample experience memories"""
-    memory_service = get_memory_service()
-    
-    sample_experiences = [
+_EXPERIENCE_REQUESTS = _build_requests(
+    MemoryType.EXPERIENCE,
+    [
         {
             "content": "When processing large batches of data, using batch processing can significantly improve performance. Recommended batch size is between 25-50.",
             "tags": ["Performance Optimization", "Batch Processing", "Best Practices"],
@@ -106,33 +97,13 @@ async def import_sample_experiences():
             "tags": ["Caching", "Architecture", "Performance Optimization"],
             "importance": ImportanceLevel.HIGH,
         },
-    ]
-    
-    saved_count = 0
-    for experience in sample_experiences:
-        try:
-            request = SaveMemoryRequest(
-                content=experience["content"],
-                memory_type=MemoryType.EXPERIENCE,
-                importance=experience["importance"],
-                tags=experience["tags"],
-            )
-            
-            response = await memory_service.save_memory(request)
-            logger.info(f"Saved experience memory: {response.memory_id}")
-            saved_count += 1
-            
-        except Exception as e:
-            logger.error(f"Failed to save experience memory: {e}")
-    
-    return saved_count
+    ],
+)
 
 
-async def import_sample_contexts():
-    """Import sample context memories"""
-    memory_service = get_memory_service()
-    
-    sample_contexts = [
+_CONTEXT_REQUESTS = _build_requests(
+    MemoryType.CONTEXT,
+    [
         {
             "content": "Project uses Python 3.11+, main dependencies include FastAPI, SQLite, Zhipu AI SDK, etc.",
             "tags": ["Project Config", "Tech Stack"],
@@ -143,38 +114,49 @@ async def import_sample_contexts():
             "tags": ["Architecture", "System Design"],
             "importance": ImportanceLevel.MEDIUM,
         },
-    ]
-    
-    saved_count = 0
-    for context in sample_contexts:
-        try:
-            request = SaveMemoryRequest(
-                content=context["content"],
-                memory_type=MemoryType.CONTEXT,
-                importance=context["importance"],
-                tags=context["tags"],
-            )
-            
-            response = await memory_service.save_memory(request)
-            logger.info(f"Saved context memory: {response.memory_id}")
-            saved_count += 1
-            
-        except Exception as e:
-            logger.error(f"Failed to save context memory: {e}")
-    
-    return saved_count
+    ],
+)
+
+
+async def _save_requests(memory_service, requests, label):
+    """Save a batch of memories in one transaction; bulk_save retries row by row
+    if the batch fails, so only the memories that could not be stored are lost"""
+    try:
+        responses = await memory_service.bulk_save(requests)
+    except Exception as e:
+        logger.error(f"Failed to save {label} memories: {e}")
+        return 0
+
+    for response in responses:
+        logger.info(f"Saved {label} memory: {response.memory_id}")
+
+    return len(responses)
+
+
+async def import_sample_knowledge(memory_service):
+    """Import sample knowledge memories"""
+    return await _save_requests(memory_service, _KNOWLEDGE_REQUESTS, "knowledge")
+
+
+async def import_sample_experiences(memory_service):
+    """Import sample experience memories"""
+    return await _save_requests(memory_service, _EXPERIENCE_REQUESTS, "experience")
+
+
+async def import_sample_contexts(memory_service):
+    """Import sample context memories"""
+    return await _save_requests(memory_service, _CONTEXT_REQUESTS, "context")
 
 
 async def check_existing_memories():
-    """Check existing memory count"""
+    """Check whether any memory already exists"""
     try:
         with get_db() as conn:
-            result = conn.execute("SELECT COUNT(*) FROM memories").fetchone()
-            count = result[0] if result else 0
-            return count
+            result = conn.execute("SELECT EXISTS(SELECT 1 FROM memories)").fetchone()
+            return bool(result[0]) if result else False
     except Exception as e:
-        logger.error(f"Failed to check memory count: {e}")
-        return 0
+        logger.error(f"Failed to check existing memories: {e}")
+        return False
 
 
 async def main():
@@ -184,33 +166,44 @@ async def main():
     logger.info("=" * 60)
     
     # Check existing memories
-    existing_count = await check_existing_memories()
-    logger.info(f"Existing memory count: {existing_count}")
+    has_existing = await check_existing_memories()
+    logger.info(f"Existing memories found: {has_existing}")
     
-    if existing_count > 0:
-        response = input(f"\nDatabase already has {existing_count} memories, continue adding sample data? (y/N): ")
-        if response.lower() != 'y':
-            logger.info("Initialization cancelled")
-            return
+    # Set up the memory service (LLM/embedding clients, tables) while the prompt waits
+    service_ready = asyncio.create_task(asyncio.to_thread(get_memory_service))
+    
+    try:
+        if has_existing:
+            response = await asyncio.to_thread(
+                input, "\nDatabase already has memories, continue adding sample data? (y/N): "
+            )
+            if response.lower() != 'y':
+                logger.info("Initialization cancelled")
+                return
+        
+        memory_service = await service_ready
+    finally:
+        # Settle the setup task on every path (cancelled, interrupted or done)
+        service_ready.cancel()
+        await asyncio.gather(service_ready, return_exceptions=True)
     
     logger.info("\n" + "=" * 60)
     logger.info("Starting sample memory import...")
     logger.info("=" * 60)
     
     # Import various memory types
-    knowledge_count = await import_sample_knowledge()
+    knowledge_count, experience_count, context_count = await asyncio.gather(
+        import_sample_knowledge(memory_service),
+        import_sample_experiences(memory_service),
+        import_sample_contexts(memory_service),
+    )
     logger.info(f"\nImported knowledge memories: {knowledge_count}")
-    
-    experience_count = await import_sample_experiences()
     logger.info(f"Imported experience memories: {experience_count}")
-    
-    context_count = await import_sample_contexts()
     logger.info(f"Imported context memories: {context_count}")
     
     total_imported = knowledge_count + experience_count + context_count
     
     # Get statistics
-    memory_service = get_memory_service()
     stats = await memory_service.get_memory_stats()
     
     logger.info("\n" + "=" * 60)
@@ -234,7 +227,14 @@ async def main():
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        import uvloop
+        # uvloop.run was added in uvloop 0.18
+        run = getattr(uvloop, "run", asyncio.run)
+    except ImportError:
+        run = asyncio.run
+    
+    try:
+        run(main())
     except KeyboardInterrupt:
         logger.info("\n\nUser interrupted")
     except Exception as e:
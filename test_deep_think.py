@@ -84,4 +84,10 @@ async def test():
     print("✅ Test Passed!")
 
 if __name__ == "__main__":
-    asyncio.run(test())
+    try:
+        import uvloop
+        # uvloop.run was added in uvloop 0.18
+        run = getattr(uvloop, "run", asyncio.run)
+    except ImportError:
+        run = asyncio.run
+    run(test())
@@ -30,6 +30,7 @@ _RUNTIME_DIR = _PROJECT_ROOT / "runtime"
 _DEFAULT_MAX_CONTEXT_BYTES = 200_000  # 200 KB per file
 _DEFAULT_MAX_REVISIONS = 5
 _DEFAULT_THRESHOLD = 0.8
+_JSON_DECODER = json.JSONDecoder()
 _ALLOWED_TEXT_EXTENSIONS = {
     ".md",
     ".txt",
@@ -144,13 +145,14 @@ def _parse_json_payload(text: str) -> Optional[Dict[str, Any]]:
     except json.JSONDecodeError:
         pass
 
+    # Decode the first JSON object in place so surrounding chatter is ignored
     start = raw.find("{")
-    end = raw.rfind("}")
-    if start >= 0 and end > start:
+    if start >= 0:
         try:
-            return json.loads(raw[start : end + 1])
+            payload, _ = _JSON_DECODER.raw_decode(raw, start)
         except json.JSONDecodeError:
             return None
+        return payload if isinstance(payload, dict) else None
     return None
 
 